@@ -1,5 +0,0 @@
-/**
- * Media Analyzer Service
- * Polls for pending analysis jobs and processes them using configured AI providers
- */
-import 'dotenv/config';
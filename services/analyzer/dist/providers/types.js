@@ -1,6 +0,0 @@
-"use strict";
-/**
- * Provider abstraction layer for AI media analysis
- * Supports multiple providers: Gemini, Claude, OpenAI
- */
-Object.defineProperty(exports, "__esModule", { value: true });
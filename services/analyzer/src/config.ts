@@ -7,10 +7,13 @@ import { MediaType, ProviderName } from './providers/index.js';
 export const config = {
   // General settings
   analysisEnabled: process.env.AI_ANALYSIS_ENABLED !== 'false',
+  logVerbose: process.env.LOG_VERBOSE === 'true',
   maxVideoDurationSec: Number(process.env.AI_MAX_VIDEO_DURATION_SEC ?? '300'),
+  maxMediaFileSize: Number(process.env.MAX_MEDIA_FILE_SIZE ?? String(100 * 1024 * 1024)),
 
   // Polling settings
   pollIntervalMs: Number(process.env.POLL_INTERVAL_MS ?? '5000'),
+  promptCacheTtlMs: Number(process.env.PROMPT_CACHE_TTL_MS ?? '60000'),
   maxConcurrentJobs: Number(process.env.MAX_CONCURRENT_JOBS ?? '1'),
   maxRetries: Number(process.env.MAX_RETRIES ?? '5'),
   retryBackoffBaseMs: Number(process.env.RETRY_BACKOFF_BASE_MS ?? '5000'), // Base backoff: 5s, 10s, 20s, 40s, 80s
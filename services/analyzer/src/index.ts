@@ -12,16 +12,25 @@ import {
   AnalysisResult,
   MediaType,
   MediaAnalysisResponse,
-  getProviderForMediaType,
+  ProviderName,
+  createProvider,
 } from './providers/index.js';
 
 const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
 
+// mxc://<server>/<mediaId>, with the media-id charset Synapse hands out
+const MXC_RE = /^mxc:\/\/([^/]+)\/([A-Za-z0-9_-]+)$/;
+
 class Analyzer {
   private supabase: SupabaseClient;
   private matrixToken: string | null = null;
+  private matrixTokenExpiresAt: number | null = null;
+  // Auth headers built once per login instead of per download attempt
+  private matrixAuthHeaders: Record<string, string> = {};
   private providers: Map<MediaType, AnalysisProvider> = new Map();
+  private promptCache: Map<string, { prompt: string; fetchedAt: number }> = new Map();
   private running = false;
+  private jobNotify: (() => void) | null = null;
 
   constructor() {
     validateConfig();
@@ -42,9 +51,18 @@ class Analyzer {
       openai: config.openai,
     };
 
+    // Construct each provider once and share it across the media types that
+    // use it (by default all three point at Gemini)
+    const byName = new Map<ProviderName, AnalysisProvider>();
+
     for (const mediaType of mediaTypes) {
+      const name = config.providers[mediaType];
       try {
-        const provider = getProviderForMediaType(mediaType, config.providers, providerConfig);
+        let provider = byName.get(name);
+        if (!provider) {
+          provider = createProvider(name, providerConfig);
+          byName.set(name, provider);
+        }
         this.providers.set(mediaType, provider);
         console.info(`Initialized ${provider.name} provider for ${mediaType}`);
       } catch (err) {
@@ -57,21 +75,58 @@ class Analyzer {
     console.info('Starting Media Analyzer Service');
     console.info(`Polling interval: ${config.pollIntervalMs}ms`);
     console.info(`Max retries: ${config.maxRetries}`);
+    console.info(`Max concurrent jobs: ${config.maxConcurrentJobs}`);
     console.info(`Providers: image=${config.providers.image}, video=${config.providers.video}, audio=${config.providers.audio}`);
 
     await this.matrixLogin();
+    this.subscribeToJobInserts();
     this.running = true;
 
     while (this.running) {
       try {
-        await this.processNextJob();
+        await this.processNextJobs();
       } catch (err) {
         console.error('Error in processing loop:', err);
       }
-      await sleep(config.pollIntervalMs);
+      await this.waitForWork(config.pollIntervalMs);
     }
   }
 
+  /**
+   * Subscribe to Realtime INSERTs on analysis_jobs so new jobs are picked up
+   * immediately instead of waiting out the poll interval. Polling stays in
+   * place as the fallback if the websocket drops or Realtime is not enabled.
+   */
+  private subscribeToJobInserts(): void {
+    this.supabase
+      .channel('analysis-jobs')
+      .on(
+        'postgres_changes',
+        { event: 'INSERT', schema: 'public', table: 'analysis_jobs' },
+        () => this.jobNotify?.()
+      )
+      .subscribe((status) => {
+        if (status === 'SUBSCRIBED') {
+          console.info('Subscribed to analysis_jobs inserts');
+        }
+      });
+  }
+
+  /** Sleep up to `ms`, but wake early when a new job insert is pushed. */
+  private waitForWork(ms: number): Promise<void> {
+    return new Promise((resolve) => {
+      const timer = setTimeout(() => {
+        this.jobNotify = null;
+        resolve();
+      }, ms);
+      this.jobNotify = () => {
+        clearTimeout(timer);
+        this.jobNotify = null;
+        resolve();
+      };
+    });
+  }
+
   stop(): void {
     console.info('Stopping analyzer...');
     this.running = false;
@@ -94,8 +149,14 @@ class Analyzer {
         });
 
         if (resp.status === 200) {
-          const data = (await resp.json()) as { access_token: string };
+          const data = (await resp.json()) as { access_token: string; expires_in_ms?: number };
           this.matrixToken = data.access_token;
+          this.matrixAuthHeaders = { Authorization: `Bearer ${data.access_token}` };
+          // Synapse only reports expires_in_ms when refreshable tokens are
+          // enabled; refresh a minute early to avoid racing the deadline
+          this.matrixTokenExpiresAt = data.expires_in_ms
+            ? Date.now() + data.expires_in_ms - 60000
+            : null;
           console.info('Matrix login successful');
           return;
         }
@@ -118,9 +179,25 @@ class Analyzer {
     }
   }
 
-  private async processNextJob(): Promise<void> {
-    // Poll for next pending job using FOR UPDATE SKIP LOCKED pattern
-    const { data: jobs, error: fetchError } = await this.supabase
+  private async processNextJobs(): Promise<void> {
+    // Claim up to maxConcurrentJobs and run them in parallel; each claim uses
+    // the FOR UPDATE SKIP LOCKED pattern so concurrent claims never collide
+    const jobs: AnalysisJob[] = [];
+    while (jobs.length < config.maxConcurrentJobs) {
+      const job = await this.claimJob();
+      if (!job) break;
+      jobs.push(job);
+    }
+
+    if (jobs.length === 0) {
+      return;
+    }
+
+    await Promise.all(jobs.map((job) => this.runJob(job)));
+  }
+
+  private async claimJob(): Promise<AnalysisJob | null> {
+    const { data: job, error: fetchError } = await this.supabase
       .rpc('claim_analysis_job')
       .single();
 
@@ -130,15 +207,16 @@ class Analyzer {
         // PGRST116 = no rows returned
         console.debug('No pending jobs or error:', fetchError.message);
       }
-      return;
+      return null;
     }
 
-    if (!jobs) {
-      return;
-    }
+    return (job as AnalysisJob) ?? null;
+  }
 
-    const job = jobs as AnalysisJob;
-    console.info(`Processing job ${job.id} for event ${job.event_id} (${job.media_type})`);
+  private async runJob(job: AnalysisJob): Promise<void> {
+    if (config.logVerbose) {
+      console.info(`Processing job ${job.id} for event ${job.event_id} (${job.media_type})`);
+    }
 
     try {
       await this.processJob(job);
@@ -188,11 +266,12 @@ class Analyzer {
         throw new Error(`Unknown media type: ${job.media_type}`);
     }
 
-    // Store result
+    // Store the result first, then mark the job completed. The order is the
+    // invariant: a completed job must have its media_analysis row, so the
+    // status update only goes out once the result is durably stored
     await this.storeResult(job, result, provider.name);
 
-    // Mark job as completed
-    await this.supabase
+    const { error: completeError } = await this.supabase
       .from('analysis_jobs')
       .update({
         status: 'completed',
@@ -200,10 +279,22 @@ class Analyzer {
       })
       .eq('id', job.id);
 
-    console.info(`Completed job ${job.id} in ${result.processingTimeMs}ms`);
+    if (completeError) {
+      // Rethrow so the job is retried instead of staying claimed forever;
+      // the result upsert is idempotent on re-processing
+      throw completeError;
+    }
+
+    if (config.logVerbose) {
+      console.info(`Completed job ${job.id} in ${result.processingTimeMs}ms`);
+    }
   }
 
   private async downloadMedia(mxcUrl: string): Promise<Buffer | null> {
+    if (this.matrixTokenExpiresAt !== null && Date.now() >= this.matrixTokenExpiresAt) {
+      this.matrixToken = null;
+      await this.matrixLogin();
+    }
     if (!this.matrixToken) {
       console.error('No Matrix token available');
       return null;
@@ -216,15 +307,32 @@ class Analyzer {
     }
 
     const downloadUrl = `${config.matrix.homeserverUrl}/_matrix/client/v1/media/download/${encodeURIComponent(parts.server)}/${encodeURIComponent(parts.mediaId)}`;
-    const headers = { Authorization: `Bearer ${this.matrixToken}` };
 
     for (let attempt = 0; attempt < 3; attempt++) {
       try {
-        const resp = await fetch(downloadUrl, { headers });
+        const resp = await fetch(downloadUrl, { headers: this.matrixAuthHeaders });
         if (resp.status === 200) {
+          // Reject oversized media from the headers alone, before buffering
+          // (and base64-inflating) the body for the provider call
+          const contentLength = Number(resp.headers.get('content-length'));
+          if (contentLength > config.maxMediaFileSize) {
+            await resp.body?.cancel();
+            console.error(
+              `Media too large (${contentLength} bytes, limit ${config.maxMediaFileSize}): ${mxcUrl}`
+            );
+            return null;
+          }
           const arrayBuf = await resp.arrayBuffer();
           return Buffer.from(arrayBuf);
         }
+        if (resp.status === 401 && attempt < 2) {
+          // Token was invalidated (e.g. the account logged in elsewhere);
+          // re-login once instead of failing every job until restart
+          console.warn('Matrix token rejected, re-logging in');
+          this.matrixToken = null;
+          await this.matrixLogin();
+          continue;
+        }
         if (resp.status === 404 && attempt < 2) {
           await sleep(2000);
           continue;
@@ -245,18 +353,25 @@ class Analyzer {
   }
 
   private parseMxcUrl(mxcUrl: string): { server: string; mediaId: string } | null {
-    if (!mxcUrl.startsWith('mxc://')) return null;
-    const withoutPrefix = mxcUrl.slice('mxc://'.length);
-    const [server, mediaId] = withoutPrefix.split('/', 2);
-    if (!server || !mediaId) return null;
-    return { server, mediaId };
+    const match = MXC_RE.exec(mxcUrl);
+    if (!match) return null;
+    return { server: match[1], mediaId: match[2] };
   }
 
   private async buildPrompt(mediaType: MediaType, organizationId: number | null): Promise<string> {
+    // Prompts change on the order of minutes, not per-job; cache them so a burst
+    // of jobs doesn't re-fetch the same rows from Supabase every time
+    const cacheKey = `${mediaType}:${organizationId ?? 'global'}`;
+    const cached = this.promptCache.get(cacheKey);
+    if (cached && Date.now() - cached.fetchedAt < config.promptCacheTtlMs) {
+      return cached.prompt;
+    }
+
     const prompts: string[] = [];
 
-    // Get master prompt
-    const { data: masterPrompt } = await this.supabase
+    // Master, media-type, and organization prompts are independent rows;
+    // fetch them in parallel on a cache miss
+    const masterQuery = this.supabase
       .from('ai_prompts')
       .select('prompt_content')
       .eq('prompt_type', 'master')
@@ -264,12 +379,7 @@ class Analyzer {
       .eq('is_active', true)
       .single();
 
-    if (masterPrompt?.prompt_content) {
-      prompts.push(masterPrompt.prompt_content);
-    }
-
-    // Get media-type prompt
-    const { data: mediaPrompt } = await this.supabase
+    const mediaQuery = this.supabase
       .from('ai_prompts')
       .select('prompt_content')
       .eq('prompt_type', mediaType)
@@ -277,26 +387,35 @@ class Analyzer {
       .eq('is_active', true)
       .single();
 
-    if (mediaPrompt?.prompt_content) {
-      prompts.push(mediaPrompt.prompt_content);
+    const orgQuery = organizationId
+      ? this.supabase
+          .from('ai_prompts')
+          .select('prompt_content')
+          .eq('prompt_type', mediaType)
+          .eq('organization_id', organizationId)
+          .eq('is_active', true)
+          .single()
+      : null;
+
+    const [masterResult, mediaResult, orgResult] = await Promise.all([
+      masterQuery,
+      mediaQuery,
+      orgQuery ?? Promise.resolve(null),
+    ]);
+
+    if (masterResult.data?.prompt_content) {
+      prompts.push(masterResult.data.prompt_content);
     }
-
-    // Get organization-specific prompt if applicable
-    if (organizationId) {
-      const { data: orgPrompt } = await this.supabase
-        .from('ai_prompts')
-        .select('prompt_content')
-        .eq('prompt_type', mediaType)
-        .eq('organization_id', organizationId)
-        .eq('is_active', true)
-        .single();
-
-      if (orgPrompt?.prompt_content) {
-        prompts.push(orgPrompt.prompt_content);
-      }
+    if (mediaResult.data?.prompt_content) {
+      prompts.push(mediaResult.data.prompt_content);
+    }
+    if (orgResult?.data?.prompt_content) {
+      prompts.push(orgResult.data.prompt_content);
     }
 
-    return prompts.join('\n\n');
+    const prompt = prompts.join('\n\n');
+    this.promptCache.set(cacheKey, { prompt, fetchedAt: Date.now() });
+    return prompt;
   }
 
   private parseJsonResponse(content: string): MediaAnalysisResponse | null {
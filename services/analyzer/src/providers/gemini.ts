@@ -25,7 +25,7 @@ export class GeminiProvider implements AnalysisProvider {
   }
 
   async analyzeImage(media: Buffer, mimeType: string, prompt: string): Promise<AnalysisResult> {
-    const startTime = Date.now();
+    const startTime = performance.now();
 
     const model = this.client.getGenerativeModel({ model: this.model });
 
@@ -40,7 +40,7 @@ export class GeminiProvider implements AnalysisProvider {
     const response = result.response;
     const text = response.text();
 
-    const processingTimeMs = Date.now() - startTime;
+    const processingTimeMs = Math.round(performance.now() - startTime);
 
     // Try to get token count from usage metadata
     const tokensUsed = response.usageMetadata?.totalTokenCount;
@@ -54,7 +54,7 @@ export class GeminiProvider implements AnalysisProvider {
   }
 
   async analyzeVideo(media: Buffer, mimeType: string, prompt: string): Promise<AnalysisResult> {
-    const startTime = Date.now();
+    const startTime = performance.now();
 
     const model = this.client.getGenerativeModel({ model: this.model });
 
@@ -71,7 +71,7 @@ export class GeminiProvider implements AnalysisProvider {
     const response = result.response;
     const text = response.text();
 
-    const processingTimeMs = Date.now() - startTime;
+    const processingTimeMs = Math.round(performance.now() - startTime);
     const tokensUsed = response.usageMetadata?.totalTokenCount;
 
     return {
@@ -83,7 +83,7 @@ export class GeminiProvider implements AnalysisProvider {
   }
 
   async analyzeAudio(media: Buffer, mimeType: string, prompt: string): Promise<AnalysisResult> {
-    const startTime = Date.now();
+    const startTime = performance.now();
 
     const model = this.client.getGenerativeModel({ model: this.model });
 
@@ -98,7 +98,7 @@ export class GeminiProvider implements AnalysisProvider {
     const response = result.response;
     const text = response.text();
 
-    const processingTimeMs = Date.now() - startTime;
+    const processingTimeMs = Math.round(performance.now() - startTime);
     const tokensUsed = response.usageMetadata?.totalTokenCount;
 
     return {
@@ -0,0 +1,70 @@
+/**
+ * Configuration for the database archiver service
+ */
+
+export const config = {
+  // Source databases
+  whatsappDbUrl: process.env.WHATSAPP_DB_URL ?? 'postgres://matrix@localhost/mautrix_whatsapp',
+  synapseDbUrl: process.env.SYNAPSE_DB_URL ?? 'postgres://matrix@localhost/matrix',
+
+  // Connection pool settings (shared by both source pools). The archiver is a
+  // single sequential poll loop, so a small pool is plenty; idle reaping and
+  // TCP keepalive stop half-dead connections from stalling a cycle
+  dbPool: {
+    max: Number(process.env.DB_POOL_MAX ?? '5'),
+    idleTimeoutMillis: Number(process.env.DB_POOL_IDLE_TIMEOUT_MS ?? '30000'),
+    connectionTimeoutMillis: Number(process.env.DB_POOL_CONNECT_TIMEOUT_MS ?? '10000'),
+  },
+
+  // Polling settings
+  pollIntervalMs: Number(process.env.POLL_INTERVAL_MS ?? '5000'),
+  maxPollIntervalMs: Number(process.env.MAX_POLL_INTERVAL_MS ?? '60000'),
+  batchSize: Number(process.env.BATCH_SIZE ?? '100'),
+
+  // Local paths
+  stateFile: process.env.STATE_FILE ?? '/home/matrix-ai/services/archiver-db/state.json',
+  mediaStorePath: process.env.MEDIA_STORE_PATH ?? '/home/matrix-ai/data/media_store',
+
+  // Media limits
+  maxMediaFileSize: Number(process.env.MAX_MEDIA_FILE_SIZE ?? String(100 * 1024 * 1024)),
+  mediaConcurrency: Number(process.env.MEDIA_CONCURRENCY ?? '4'),
+
+  // Supabase settings
+  supabase: {
+    url: process.env.SUPABASE_URL ?? '',
+    serviceRoleKey: process.env.SUPABASE_SERVICE_ROLE_KEY ?? '',
+  },
+
+  // Feature flags
+  aiAnalysisEnabled: process.env.AI_ANALYSIS_ENABLED !== 'false',
+  logVerbose: process.env.LOG_VERBOSE === 'true',
+};
+
+export function validateConfig(): void {
+  const errors: string[] = [];
+
+  if (!config.supabase.url) errors.push('SUPABASE_URL is required');
+  if (!config.supabase.serviceRoleKey) errors.push('SUPABASE_SERVICE_ROLE_KEY is required');
+  if (!Number.isFinite(config.pollIntervalMs) || config.pollIntervalMs <= 0) {
+    errors.push('POLL_INTERVAL_MS must be a positive number');
+  }
+  if (!Number.isFinite(config.maxPollIntervalMs) || config.maxPollIntervalMs < config.pollIntervalMs) {
+    errors.push('MAX_POLL_INTERVAL_MS must be at least POLL_INTERVAL_MS');
+  }
+  if (!Number.isFinite(config.batchSize) || config.batchSize <= 0) {
+    errors.push('BATCH_SIZE must be a positive number');
+  }
+  if (!Number.isFinite(config.maxMediaFileSize) || config.maxMediaFileSize <= 0) {
+    errors.push('MAX_MEDIA_FILE_SIZE must be a positive number');
+  }
+  if (!Number.isFinite(config.dbPool.max) || config.dbPool.max <= 0) {
+    errors.push('DB_POOL_MAX must be a positive number');
+  }
+  if (!Number.isFinite(config.mediaConcurrency) || config.mediaConcurrency <= 0) {
+    errors.push('MEDIA_CONCURRENCY must be a positive number');
+  }
+
+  if (errors.length > 0) {
+    throw new Error(`Configuration errors:\n${errors.join('\n')}`);
+  }
+}
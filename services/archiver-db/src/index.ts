@@ -3,17 +3,7 @@ import { Pool } from 'pg';
 import { createClient, SupabaseClient } from '@supabase/supabase-js';
 import * as fs from 'fs';
 import * as path from 'path';
-
-// Configuration
-const WHATSAPP_DB_URL = process.env.WHATSAPP_DB_URL ?? 'postgres://matrix@localhost/mautrix_whatsapp';
-const SYNAPSE_DB_URL = process.env.SYNAPSE_DB_URL ?? 'postgres://matrix@localhost/matrix';
-const SUPABASE_URL = process.env.SUPABASE_URL ?? '';
-const SUPABASE_SERVICE_ROLE_KEY = process.env.SUPABASE_SERVICE_ROLE_KEY ?? '';
-const POLL_INTERVAL_MS = Number(process.env.POLL_INTERVAL_MS ?? '5000');
-const BATCH_SIZE = Number(process.env.BATCH_SIZE ?? '100');
-const STATE_FILE = process.env.STATE_FILE ?? '/home/matrix-ai/services/archiver-db/state.json';
-const MEDIA_STORE_PATH = process.env.MEDIA_STORE_PATH ?? '/home/matrix-ai/data/media_store';
-const AI_ANALYSIS_ENABLED = process.env.AI_ANALYSIS_ENABLED !== 'false';
+import { config, validateConfig } from './config';
 
 // Types
 interface BridgeMessage {
@@ -24,7 +14,6 @@ interface BridgeMessage {
   sender_id: string;
   sender_mxid: string;
   timestamp: bigint;
-  metadata: Record<string, unknown>;
   // Joined from portal
   matrix_room_id: string;
   room_name: string;
@@ -51,22 +40,136 @@ interface State {
   lastRowId: number;
 }
 
-const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+// Rows as they are upserted into Supabase
+interface BaseRecord {
+  event_id: string;
+  room_id: string;
+  room_name: string;
+  room_display_name: string;
+  sender: string;
+  sender_display_name: string;
+  timestamp: number;
+  message_type: string;
+  content: MatrixEvent['content'];
+}
+
+interface NoticeRecord extends BaseRecord {
+  notice_type: string;
+  body: string;
+}
+
+interface MediaRecord {
+  event_id: string;
+  media_type: string;
+  original_filename: string;
+  file_size: number | null;
+  mime_type: string;
+  matrix_url: string;
+  storage_path: string;
+  public_url: string;
+}
+
+interface AnalysisJobRecord {
+  event_id: string;
+  room_id: string;
+  media_type: string;
+  media_url: string;
+  media_info: MatrixEvent['content']['info'] | null;
+  status: string;
+}
+
+// mxc://<server>/<mediaId>. Strict media-id charset matters here because the
+// id is joined into media-store filesystem paths
+const MXC_RE = /^mxc:\/\/([^/]+)\/([A-Za-z0-9_-]+)$/;
+
+// Filenames come from bridged users; only plain alphanumeric extensions are
+// allowed into storage paths. Compiled once at module load
+const SAFE_EXT_RE = /^\.[A-Za-z0-9]{1,10}$/;
+
+/** Sanitized extension (including the dot) from a filename, or '.bin'. */
+const fileExtension = (filename: string): string => {
+  const dot = filename.lastIndexOf('.');
+  if (dot <= 0) return '.bin';
+  const ext = filename.slice(dot);
+  return SAFE_EXT_RE.test(ext) ? ext.toLowerCase() : '.bin';
+};
+
+// Shared empty sentinels so per-event fallbacks don't allocate a fresh object
+const EMPTY_CONTENT: MatrixEvent['content'] = {};
+const EMPTY_INFO: NonNullable<MatrixEvent['content']['info']> = {};
+
+// Message types that carry media
+const MEDIA_MSGTYPES = new Set(['m.image', 'm.video', 'm.audio', 'm.file']);
+
+// Matrix msgtype -> analysis_jobs.media_type; also defines which media is
+// worth sending to AI analysis (m.file is archived but not analyzed)
+const MEDIA_TYPE_MAP: Record<string, string> = {
+  'm.image': 'image',
+  'm.video': 'video',
+  'm.audio': 'audio',
+};
+
+// Hot-path queries are named so pg prepares them once per connection and
+// subsequent cycles skip the parse/plan steps
+const PROBE_SQL = {
+  name: 'archiver-probe',
+  text: 'SELECT 1 FROM message WHERE timestamp > $1 OR (timestamp = $1 AND rowid > $2) LIMIT 1',
+};
+
+const POLL_SQL = {
+  name: 'archiver-poll',
+  text: `
+    SELECT
+      m.rowid,
+      m.id,
+      m.mxid,
+      m.room_id,
+      m.sender_id,
+      m.sender_mxid,
+      m.timestamp,
+      p.mxid as matrix_room_id,
+      p.name as room_name,
+      g.name as sender_name
+    FROM message m
+    JOIN portal p ON m.room_id = p.id AND m.bridge_id = p.bridge_id
+    JOIN ghost g ON m.sender_id = g.id AND m.bridge_id = g.bridge_id
+    WHERE m.timestamp > $1 OR (m.timestamp = $1 AND m.rowid > $2)
+    ORDER BY m.timestamp ASC, m.rowid ASC
+    LIMIT $3
+  `,
+};
+
+const FETCH_EVENTS_SQL = {
+  name: 'archiver-fetch-events',
+  text: 'SELECT event_id, json FROM event_json WHERE event_id = ANY($1)',
+};
 
 class DatabaseArchiver {
   private whatsappDb: Pool;
   private synapseDb: Pool;
   private supabase: SupabaseClient;
   private state: State;
+  private lastSavedState = '';
+  private running = true;
+  private wakeUp: (() => void) | null = null;
+  // Per-batch counters, reported as one summary line instead of a log write
+  // per archived row
+  private batchStats = { messages: 0, notices: 0, media: 0 };
 
   constructor() {
-    if (!SUPABASE_URL || !SUPABASE_SERVICE_ROLE_KEY) {
-      throw new Error('Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY');
-    }
+    validateConfig();
 
-    this.whatsappDb = new Pool({ connectionString: WHATSAPP_DB_URL });
-    this.synapseDb = new Pool({ connectionString: SYNAPSE_DB_URL });
-    this.supabase = createClient(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, {
+    this.whatsappDb = new Pool({
+      connectionString: config.whatsappDbUrl,
+      keepAlive: true,
+      ...config.dbPool,
+    });
+    this.synapseDb = new Pool({
+      connectionString: config.synapseDbUrl,
+      keepAlive: true,
+      ...config.dbPool,
+    });
+    this.supabase = createClient(config.supabase.url, config.supabase.serviceRoleKey, {
       auth: { autoRefreshToken: false, persistSession: false },
     });
 
@@ -75,8 +178,8 @@ class DatabaseArchiver {
 
   private loadState(): State {
     try {
-      if (fs.existsSync(STATE_FILE)) {
-        const data = fs.readFileSync(STATE_FILE, 'utf-8');
+      if (fs.existsSync(config.stateFile)) {
+        const data = fs.readFileSync(config.stateFile, 'utf-8');
         return JSON.parse(data);
       }
     } catch (err) {
@@ -88,8 +191,17 @@ class DatabaseArchiver {
   }
 
   private saveState(): void {
+    const serialized = JSON.stringify(this.state, null, 2);
+    if (serialized === this.lastSavedState) {
+      return; // Nothing advanced since the last write
+    }
     try {
-      fs.writeFileSync(STATE_FILE, JSON.stringify(this.state, null, 2));
+      // Write-then-rename so a crash mid-write can't corrupt the cursor file
+      // and force a 24-hour re-archive on the next start
+      const tmpFile = `${config.stateFile}.tmp`;
+      fs.writeFileSync(tmpFile, serialized);
+      fs.renameSync(tmpFile, config.stateFile);
+      this.lastSavedState = serialized;
     } catch (err) {
       console.error('Failed to save state:', err);
     }
@@ -97,23 +209,51 @@ class DatabaseArchiver {
 
   async run(): Promise<void> {
     console.info('Starting Database-Based Message Archiver');
-    console.info(`Polling interval: ${POLL_INTERVAL_MS}ms, Batch size: ${BATCH_SIZE}`);
+    console.info(`Polling interval: ${config.pollIntervalMs}ms, Batch size: ${config.batchSize}`);
     console.info(`Starting from timestamp: ${this.state.lastTimestamp}`);
 
     // Test database connections
     await this.testConnections();
 
     // Main polling loop
-    while (true) {
+    let delayMs = config.pollIntervalMs;
+    while (this.running) {
+      let processed = 0;
       try {
-        await this.pollMessages();
+        processed = await this.pollMessages();
       } catch (err) {
         console.error('Poll cycle error:', err);
       }
-      await sleep(POLL_INTERVAL_MS);
+      if (!this.running) break;
+      // Back off while idle so quiet deployments don't hammer the databases;
+      // the jitter keeps multiple archiver instances from polling in lockstep
+      delayMs = processed > 0 ? config.pollIntervalMs : Math.min(delayMs * 2, config.maxPollIntervalMs);
+      await this.idleSleep(delayMs + Math.random() * 1000);
     }
   }
 
+  /** Sleep that stop() can cut short, so shutdown doesn't wait out the idle backoff. */
+  private idleSleep(ms: number): Promise<void> {
+    return new Promise((resolve) => {
+      const timer = setTimeout(() => {
+        this.wakeUp = null;
+        resolve();
+      }, ms);
+      this.wakeUp = () => {
+        clearTimeout(timer);
+        this.wakeUp = null;
+        resolve();
+      };
+    });
+  }
+
+  /** Stop the polling loop after the in-flight cycle completes. */
+  stop(): void {
+    console.info('Stopping archiver...');
+    this.running = false;
+    this.wakeUp?.();
+  }
+
   private async testConnections(): Promise<void> {
     console.info('Testing database connections...');
 
@@ -134,102 +274,145 @@ class DatabaseArchiver {
     console.info('Supabase client initialized');
   }
 
-  private async pollMessages(): Promise<void> {
+  private async pollMessages(): Promise<number> {
+    // Most poll cycles find nothing new; probe the message table alone before
+    // paying for the three-way join against portal and ghost
+    const probe = await this.whatsappDb.query({
+      ...PROBE_SQL,
+      values: [this.state.lastTimestamp, this.state.lastRowId],
+    });
+
+    if (probe.rows.length === 0) {
+      return 0; // No new messages
+    }
+
     // Query new messages from mautrix_whatsapp
-    const query = `
-      SELECT
-        m.rowid,
-        m.id,
-        m.mxid,
-        m.room_id,
-        m.sender_id,
-        m.sender_mxid,
-        m.timestamp,
-        m.metadata,
-        p.mxid as matrix_room_id,
-        p.name as room_name,
-        g.name as sender_name
-      FROM message m
-      JOIN portal p ON m.room_id = p.id AND m.bridge_id = p.bridge_id
-      JOIN ghost g ON m.sender_id = g.id AND m.bridge_id = g.bridge_id
-      WHERE m.timestamp > $1 OR (m.timestamp = $1 AND m.rowid > $2)
-      ORDER BY m.timestamp ASC, m.rowid ASC
-      LIMIT $3
-    `;
-
-    const result = await this.whatsappDb.query<BridgeMessage>(query, [
-      this.state.lastTimestamp,
-      this.state.lastRowId,
-      BATCH_SIZE,
-    ]);
+    const result = await this.whatsappDb.query<BridgeMessage>({
+      ...POLL_SQL,
+      values: [this.state.lastTimestamp, this.state.lastRowId, config.batchSize],
+    });
 
     if (result.rows.length === 0) {
-      return; // No new messages
+      return 0; // No new messages
+    }
+
+    if (config.logVerbose) {
+      console.info(`Processing ${result.rows.length} new messages...`);
     }
 
-    console.info(`Processing ${result.rows.length} new messages...`);
+    // Fetch the full event content for the whole batch in one round-trip
+    // instead of querying Synapse once per message
+    const events = await this.fetchEvents(result.rows.map((msg) => msg.mxid));
+
+    this.batchStats = { messages: 0, notices: 0, media: 0 };
+
+    // Classify the batch in memory first, then archive messages and notices
+    // with one bulk upsert each instead of a Supabase round-trip per row
+    const messageRows: BaseRecord[] = [];
+    const noticeRows: NoticeRecord[] = [];
+    const mediaWork: { msg: BridgeMessage; event: MatrixEvent }[] = [];
 
     for (const msg of result.rows) {
+      const rawEvent = events.get(msg.mxid);
+      if (!rawEvent) {
+        console.warn(`Event not found in Synapse: ${msg.mxid}`);
+        continue;
+      }
+
+      let event: MatrixEvent;
       try {
-        await this.processMessage(msg);
-        // Update state after each successful message
-        this.state.lastTimestamp = msg.timestamp.toString();
-        this.state.lastRowId = msg.rowid;
+        event = JSON.parse(rawEvent);
       } catch (err) {
-        console.error(`Failed to process message ${msg.mxid}:`, err);
+        console.error(`Failed to parse event ${msg.mxid}:`, err);
+        continue;
       }
-    }
-
-    this.saveState();
-    console.info(`Processed ${result.rows.length} messages. Last timestamp: ${this.state.lastTimestamp}`);
-  }
 
-  private async processMessage(msg: BridgeMessage): Promise<void> {
-    // Get full event content from Synapse
-    const eventQuery = 'SELECT json FROM event_json WHERE event_id = $1';
-    const eventResult = await this.synapseDb.query<{ json: string }>(eventQuery, [msg.mxid]);
+      // Skip non-message events
+      if (event.type !== 'm.room.message') {
+        continue;
+      }
 
-    if (eventResult.rows.length === 0) {
-      console.warn(`Event not found in Synapse: ${msg.mxid}`);
-      return;
+      const noticeType = this.classifyNotice(event);
+      if (noticeType) {
+        noticeRows.push({
+          ...this.buildBaseRecord(msg, event),
+          notice_type: noticeType,
+          body: event.content?.body ?? '',
+        });
+      } else {
+        messageRows.push(this.buildBaseRecord(msg, event));
+        mediaWork.push({ msg, event });
+      }
     }
 
-    const event: MatrixEvent = JSON.parse(eventResult.rows[0].json);
-
-    // Skip non-message events
-    if (event.type !== 'm.room.message') {
-      return;
+    if (messageRows.length > 0) {
+      const { error } = await this.supabase
+        .from('messages')
+        .upsert(messageRows, { onConflict: 'event_id' });
+      if (error) {
+        // Leave the cursor where it is: upserts are idempotent, so the whole
+        // batch simply retries on the next cycle
+        console.error('Failed to archive message batch:', error);
+        return 0;
+      }
+      this.batchStats.messages = messageRows.length;
     }
 
-    // Check if this is a notice/error
-    if (this.isNoticeOrError(event)) {
-      await this.archiveNotice(msg, event);
-      return;
+    if (noticeRows.length > 0) {
+      const { error } = await this.supabase
+        .from('notices')
+        .upsert(noticeRows, { onConflict: 'event_id' });
+      if (error) {
+        console.error('Failed to archive notice batch:', error);
+        return 0;
+      }
+      this.batchStats.notices = noticeRows.length;
     }
 
-    // Archive as regular message
-    await this.archiveMessage(msg, event);
+    // Media is handled after the text is safely archived. A media failure
+    // must not fail the message: rethrowing would keep the poll cursor parked
+    // on this batch, re-processing it every cycle
+    await this.handleMediaBatch(mediaWork);
+
+    const lastRow = result.rows[result.rows.length - 1];
+    this.state.lastTimestamp = lastRow.timestamp.toString();
+    this.state.lastRowId = lastRow.rowid;
+    this.saveState();
+    const { messages, notices, media } = this.batchStats;
+    console.info(
+      `Processed ${result.rows.length} rows (${messages} messages, ${notices} notices, ${media} media). Last timestamp: ${this.state.lastTimestamp}`
+    );
+    return result.rows.length;
   }
 
-  private isNoticeOrError(event: MatrixEvent): boolean {
-    const msgtype = event.content?.msgtype ?? '';
-    const body = (event.content?.body ?? '').toLowerCase();
-    if (msgtype === 'm.notice') return true;
-    if ('fi.mau.bridge_state' in (event.content ?? {})) return true;
-    const indicators = ['not bridged', 'failed to bridge', 'was not bridged'];
-    return indicators.some((marker) => body.includes(marker));
+  private async fetchEvents(eventIds: string[]): Promise<Map<string, string>> {
+    const eventResult = await this.synapseDb.query<{ event_id: string; json: string }>({
+      ...FETCH_EVENTS_SQL,
+      values: [eventIds],
+    });
+
+    return new Map(eventResult.rows.map((row) => [row.event_id, row.json]));
   }
 
-  private determineNoticeType(event: MatrixEvent): string {
-    if ('fi.mau.bridge_state' in (event.content ?? {})) return 'bridge_state';
-    const body = (event.content?.body ?? '').toLowerCase();
+  /**
+   * Classify bridge notices/errors in a single pass.
+   * Returns the notice type, or null for regular messages.
+   */
+  private classifyNotice(event: MatrixEvent): string | null {
+    const content = event.content ?? EMPTY_CONTENT;
+    if ('fi.mau.bridge_state' in content) return 'bridge_state';
+
+    const body = (content.body ?? '').toLowerCase();
+    // 'not bridged' also covers the 'was not bridged' variant
     if (body.includes('not bridged') || body.includes('failed to bridge')) return 'error';
-    if (body.includes('warning') || (event.content?.body ?? '').includes('warning')) return 'warning';
+    if (content.msgtype !== 'm.notice') return null;
+    if (body.includes('warning')) return 'warning';
     return 'info';
   }
 
-  private async archiveNotice(msg: BridgeMessage, event: MatrixEvent): Promise<void> {
-    const notice = {
+  /** Fields shared between the messages and notices tables. */
+  private buildBaseRecord(msg: BridgeMessage, event: MatrixEvent): BaseRecord {
+    return {
       event_id: msg.mxid,
       room_id: msg.matrix_room_id,
       room_name: msg.room_name,
@@ -238,82 +421,106 @@ class DatabaseArchiver {
       sender_display_name: msg.sender_name || msg.sender_mxid,
       timestamp: event.origin_server_ts,
       message_type: event.type,
-      content: event.content,
-      notice_type: this.determineNoticeType(event),
-      body: event.content?.body ?? '',
+      content: event.content ?? EMPTY_CONTENT,
     };
-
-    const { error } = await this.supabase.from('notices').upsert(notice, { onConflict: 'event_id' });
-    if (error) {
-      console.error('Failed to archive notice:', error);
-    } else {
-      console.info(`Archived notice ${msg.mxid}`);
-    }
   }
 
-  private async archiveMessage(msg: BridgeMessage, event: MatrixEvent): Promise<void> {
-    const message = {
-      event_id: msg.mxid,
-      room_id: msg.matrix_room_id,
-      room_name: msg.room_name,
-      room_display_name: msg.room_name || msg.matrix_room_id,
-      sender: msg.sender_mxid,
-      sender_display_name: msg.sender_name || msg.sender_mxid,
-      timestamp: event.origin_server_ts,
-      message_type: event.type,
-      content: event.content ?? {},
-    };
-
-    const { error } = await this.supabase.from('messages').upsert(message, { onConflict: 'event_id' });
-    if (error) {
-      console.error('Failed to archive message:', error);
-      return;
+  /**
+   * Process the batch's media with a few workers in parallel. Each item is a
+   * disk read plus two or three Supabase round-trips, so modest concurrency
+   * turns a media-heavy batch from latency-bound into bandwidth-bound without
+   * buffering more than mediaConcurrency files at once.
+   */
+  private async handleMediaBatch(work: { msg: BridgeMessage; event: MatrixEvent }[]): Promise<void> {
+    const jobRows: AnalysisJobRecord[] = [];
+    let next = 0;
+    const workerCount = Math.min(config.mediaConcurrency, work.length);
+    const workers = Array.from({ length: workerCount }, async () => {
+      while (next < work.length) {
+        const { msg, event } = work[next++];
+        try {
+          await this.handleMediaIfPresent(msg, event, jobRows);
+        } catch (err) {
+          console.error(`Media handling failed for ${msg.mxid}:`, err);
+        }
+      }
+    });
+    await Promise.all(workers);
+
+    // Enqueue the cycle's analysis jobs in one upsert. DO NOTHING on
+    // conflict: re-polling an already-seen event must not reset a completed
+    // or in-flight job back to pending
+    if (jobRows.length > 0) {
+      const { error } = await this.supabase
+        .from('analysis_jobs')
+        .upsert(jobRows, { onConflict: 'event_id', ignoreDuplicates: true });
+      if (error) {
+        console.error('Failed to enqueue analysis jobs:', error);
+      } else if (config.logVerbose) {
+        console.info(`Enqueued ${jobRows.length} analysis jobs`);
+      }
     }
-
-    console.info(`Archived message ${msg.mxid} from ${msg.sender_name} in ${msg.room_name}`);
-
-    // Handle media if present
-    await this.handleMediaIfPresent(msg, event);
   }
 
-  private async handleMediaIfPresent(msg: BridgeMessage, event: MatrixEvent): Promise<void> {
-    const content = event.content ?? {};
+  private async handleMediaIfPresent(
+    msg: BridgeMessage,
+    event: MatrixEvent,
+    jobRows: AnalysisJobRecord[]
+  ): Promise<void> {
+    const content = event.content ?? EMPTY_CONTENT;
     const msgtype = content.msgtype;
-    const mxcUrl = content.url as string | undefined;
+    const mxcUrl = content.url;
 
     if (!mxcUrl || !mxcUrl.startsWith('mxc://')) return;
-    if (!['m.image', 'm.video', 'm.audio', 'm.file'].includes(msgtype ?? '')) return;
+    if (!MEDIA_MSGTYPES.has(msgtype ?? '')) return;
+
+    // Re-polled events (e.g. after a restart before the cursor advanced) have
+    // usually been uploaded already; a cheap metadata probe beats re-reading
+    // the file from disk and re-uploading it
+    const { data: existing } = await this.supabase
+      .from('media')
+      .select('storage_path')
+      .eq('event_id', msg.mxid)
+      .maybeSingle();
+
+    if (existing?.storage_path) {
+      // Storage and metadata are in place; just make sure the analysis job
+      // exists (a no-op insert when it does) and skip the upload
+      this.collectAnalysisJob(msg, event, jobRows);
+      return;
+    }
 
     // Try to read media from local file system
     const mediaData = await this.readMediaFromStore(mxcUrl);
-    let storagePath: string | null = null;
-
-    if (mediaData) {
-      storagePath = await this.uploadToSupabaseStorage(
-        mediaData,
-        msg.mxid,
-        content.body as string ?? 'unknown',
-        content.info?.mimetype as string
-      );
-    } else {
+    if (!mediaData) {
       console.warn(`Media not found in local store for ${msg.mxid}`);
     }
 
-    // Save media metadata
-    await this.saveMediaMetadata(msg, event, storagePath);
+    // Resolve the storage path once; the upload and the metadata row both
+    // need it
+    const storagePath = `${msg.mxid}${fileExtension(content.body ?? 'unknown')}`;
 
-    // Enqueue AI analysis job
-    if (AI_ANALYSIS_ENABLED && ['m.image', 'm.video', 'm.audio'].includes(msgtype ?? '')) {
-      await this.enqueueAnalysisJob(msg, event);
+    // The analysis job doesn't depend on the upload (the analyzer fetches
+    // media through the Matrix API, not from storage); it just joins the
+    // batch's single enqueue upsert
+    this.collectAnalysisJob(msg, event, jobRows);
+
+    const uploaded = mediaData
+      ? await this.uploadToSupabaseStorage(mediaData, storagePath, content.info?.mimetype)
+      : false;
+
+    if (uploaded) {
+      this.batchStats.media++;
     }
+
+    // Save media metadata (depends on the final storage path)
+    await this.saveMediaMetadata(msg, event, uploaded ? storagePath : null);
   }
 
   private parseMxcUrl(mxcUrl: string): { server: string; mediaId: string } | null {
-    if (!mxcUrl.startsWith('mxc://')) return null;
-    const withoutPrefix = mxcUrl.slice('mxc://'.length);
-    const [server, mediaId] = withoutPrefix.split('/', 2);
-    if (!server || !mediaId) return null;
-    return { server, mediaId };
+    const match = MXC_RE.exec(mxcUrl);
+    if (!match) return null;
+    return { server: match[1], mediaId: match[2] };
   }
 
   private async readMediaFromStore(mxcUrl: string): Promise<Buffer | null> {
@@ -325,19 +532,33 @@ class DatabaseArchiver {
     const mediaId = parts.mediaId;
     const prefix = mediaId.substring(0, 2);
     const suffix = mediaId.substring(2, 4);
-    const mediaPath = path.join(MEDIA_STORE_PATH, 'local_content', prefix, suffix, mediaId);
-
-    try {
-      if (fs.existsSync(mediaPath)) {
-        return fs.readFileSync(mediaPath);
-      }
-      // Also try remote_content for federated media
-      const remotePath = path.join(MEDIA_STORE_PATH, 'remote_content', parts.server, prefix, suffix, mediaId);
-      if (fs.existsSync(remotePath)) {
-        return fs.readFileSync(remotePath);
+    // Local media first, then remote_content for federated media, treating
+    // ENOENT as "try the next location"
+    const candidates = [
+      path.join(config.mediaStorePath, 'local_content', prefix, suffix, mediaId),
+      path.join(config.mediaStorePath, 'remote_content', parts.server, prefix, suffix, mediaId),
+    ];
+
+    for (const mediaPath of candidates) {
+      try {
+        // Check the size before reading: the whole file is buffered in memory
+        // for the storage upload, so an unbounded read of a large video can
+        // pin hundreds of MB of heap in one poll cycle. Async fs calls keep
+        // the event loop free for the other media workers while a large file
+        // is read off disk
+        const { size } = await fs.promises.stat(mediaPath);
+        if (size > config.maxMediaFileSize) {
+          console.warn(
+            `Skipping media for ${mxcUrl}: ${size} bytes exceeds limit of ${config.maxMediaFileSize}`
+          );
+          return null;
+        }
+        return await fs.promises.readFile(mediaPath);
+      } catch (err) {
+        if ((err as NodeJS.ErrnoException).code !== 'ENOENT') {
+          console.warn(`Failed to read media from store: ${err}`);
+        }
       }
-    } catch (err) {
-      console.warn(`Failed to read media from store: ${err}`);
     }
 
     return null;
@@ -345,23 +566,19 @@ class DatabaseArchiver {
 
   private async uploadToSupabaseStorage(
     mediaData: Buffer,
-    eventId: string,
-    filename: string,
+    storagePath: string,
     mimetype = 'application/octet-stream'
-  ): Promise<string | null> {
-    const ext = filename.includes('.') ? filename.slice(filename.lastIndexOf('.')) : '.bin';
-    const storagePath = `${eventId}${ext}`;
-
+  ): Promise<boolean> {
     const { error } = await this.supabase.storage
       .from('matrix-media')
       .upload(storagePath, mediaData, { contentType: mimetype, upsert: true });
 
     if (error) {
       console.error('Failed to upload media:', error);
-      return null;
+      return false;
     }
 
-    return storagePath;
+    return true;
   }
 
   private async saveMediaMetadata(
@@ -369,13 +586,13 @@ class DatabaseArchiver {
     event: MatrixEvent,
     storagePath: string | null
   ): Promise<void> {
-    const content = event.content ?? {};
-    const info = content.info ?? {};
+    const content = event.content ?? EMPTY_CONTENT;
+    const info = content.info ?? EMPTY_INFO;
     const publicUrl = storagePath
       ? this.supabase.storage.from('matrix-media').getPublicUrl(storagePath).data.publicUrl
       : '';
 
-    const mediaRecord = {
+    const mediaRecord: MediaRecord = {
       event_id: msg.mxid,
       media_type: content.msgtype ?? 'm.file',
       original_filename: content.body ?? 'unknown',
@@ -392,35 +609,22 @@ class DatabaseArchiver {
     }
   }
 
-  private async enqueueAnalysisJob(msg: BridgeMessage, event: MatrixEvent): Promise<void> {
-    const content = event.content ?? {};
-    const msgtype = content.msgtype ?? '';
-    const mediaTypeMap: Record<string, string> = {
-      'm.image': 'image',
-      'm.video': 'video',
-      'm.audio': 'audio',
-    };
-    const mediaType = mediaTypeMap[msgtype];
+  /** Add a pending analysis-job row for analyzable media to the batch's enqueue list. */
+  private collectAnalysisJob(msg: BridgeMessage, event: MatrixEvent, jobRows: AnalysisJobRecord[]): void {
+    if (!config.aiAnalysisEnabled) return;
+
+    const content = event.content ?? EMPTY_CONTENT;
+    const mediaType = MEDIA_TYPE_MAP[content.msgtype ?? ''];
     if (!mediaType) return;
 
-    const job = {
+    jobRows.push({
       event_id: msg.mxid,
       room_id: msg.matrix_room_id,
       media_type: mediaType,
       media_url: content.url ?? '',
       media_info: content.info ?? null,
       status: 'pending',
-    };
-
-    const { error } = await this.supabase
-      .from('analysis_jobs')
-      .upsert(job, { onConflict: 'event_id' });
-
-    if (error) {
-      console.error('Failed to enqueue analysis job:', error);
-    } else {
-      console.info(`Enqueued ${mediaType} analysis job for ${msg.mxid}`);
-    }
+    });
   }
 
   async shutdown(): Promise<void> {
@@ -435,18 +639,22 @@ class DatabaseArchiver {
 async function main(): Promise<void> {
   const archiver = new DatabaseArchiver();
 
-  // Handle graceful shutdown
-  process.on('SIGINT', async () => {
-    await archiver.shutdown();
-    process.exit(0);
+  // Graceful shutdown: stop the loop so the in-flight poll cycle finishes
+  // (and the cursor is saved) before the pools are torn down, instead of
+  // killing the process mid-cycle
+  process.on('SIGINT', () => {
+    console.info('Received SIGINT');
+    archiver.stop();
   });
-  process.on('SIGTERM', async () => {
-    await archiver.shutdown();
-    process.exit(0);
+  process.on('SIGTERM', () => {
+    console.info('Received SIGTERM');
+    archiver.stop();
   });
 
   try {
     await archiver.run();
+    await archiver.shutdown();
+    process.exit(0);
   } catch (err) {
     console.error('Fatal error:', err);
     await archiver.shutdown();
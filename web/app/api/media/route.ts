@@ -1,12 +1,15 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@supabase/supabase-js';
-
-const supabase = createClient(
-  process.env.SUPABASE_URL || '',
-  process.env.SUPABASE_SERVICE_ROLE_KEY || ''
-);
+import { supabase } from '../../../lib/supabaseClient';
+import { getCachedMediaUrl, setCachedMediaUrl } from '../../../lib/mediaUrlCache';
 
 async function getSupabaseMediaUrl(mxcUrl: string): Promise<string | null> {
+  // Each media item on a page hits this route; the URL is immutable once
+  // archived, so serve repeats from the cache instead of querying per view
+  const cached = getCachedMediaUrl(mxcUrl);
+  if (cached) {
+    return cached;
+  }
+
   try {
     const { data, error } = await supabase
       .from('media')
@@ -18,6 +21,7 @@ async function getSupabaseMediaUrl(mxcUrl: string): Promise<string | null> {
       return null;
     }
 
+    setCachedMediaUrl(mxcUrl, data.public_url);
     return data.public_url;
   } catch (err) {
     console.error('Error looking up media in Supabase:', err);
@@ -1,10 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@supabase/supabase-js';
-
-const supabase = createClient(
-  process.env.SUPABASE_URL || '',
-  process.env.SUPABASE_SERVICE_ROLE_KEY || ''
-);
+import { supabase } from '../../../../lib/supabaseClient';
+import { setCachedPrompt } from '../../../../lib/promptCache';
 
 // GET prompts (system and room-specific)
 export async function GET(request: NextRequest) {
@@ -75,6 +71,9 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: 'Failed to save prompt' }, { status: 500 });
     }
 
+    // Write through so the report route picks up the edit immediately
+    setCachedPrompt(`room:${room_id}`, data?.prompt_content || null);
+
     return NextResponse.json({
       success: true,
       roomPrompt: data?.prompt_content || '',
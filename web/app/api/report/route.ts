@@ -1,12 +1,16 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@supabase/supabase-js';
 import { GoogleGenerativeAI } from '@google/generative-ai';
 import { logLLMCall } from '../../../lib/llmLogger';
+import { supabase } from '../../../lib/supabaseClient';
+import { getCachedPrompt, setCachedPrompt } from '../../../lib/promptCache';
 
-const supabase = createClient(
-  process.env.SUPABASE_URL || '',
-  process.env.SUPABASE_SERVICE_ROLE_KEY || ''
-);
+const GEMINI_MODEL = 'gemini-flash-latest';
+
+// Construct the Gemini client once per server process so its underlying HTTP
+// connections are reused across report requests
+const genAI = process.env.GOOGLE_AI_API_KEY
+  ? new GoogleGenerativeAI(process.env.GOOGLE_AI_API_KEY)
+  : null;
 
 type Message = {
   event_id: string;
@@ -150,23 +154,40 @@ export async function GET(request: NextRequest) {
   console.log(`[Report API] Period: ${period}, Start: ${new Date(startTimestamp).toISOString()}, End: ${new Date(endTimestamp).toISOString()}`);
 
   try {
-    // 1. Fetch system prompt
-    const { data: systemPrompt } = await supabase
-      .from('report_prompts')
-      .select('prompt_content')
-      .eq('prompt_type', 'system')
-      .is('room_id', null)
-      .eq('is_active', true)
-      .single();
-
-    // 2. Fetch room-specific prompt (if any)
-    const { data: roomPrompt } = await supabase
-      .from('report_prompts')
-      .select('prompt_content')
-      .eq('prompt_type', 'room')
-      .eq('room_id', roomId)
-      .eq('is_active', true)
-      .single();
+    // 1. Fetch system prompt (cached; it changes rarely)
+    let systemPromptContent: string | null;
+    const cachedSystem = getCachedPrompt('system');
+    if (cachedSystem.hit) {
+      systemPromptContent = cachedSystem.value;
+    } else {
+      const { data: systemPrompt } = await supabase
+        .from('report_prompts')
+        .select('prompt_content')
+        .eq('prompt_type', 'system')
+        .is('room_id', null)
+        .eq('is_active', true)
+        .single();
+      systemPromptContent = systemPrompt?.prompt_content || null;
+      setCachedPrompt('system', systemPromptContent);
+    }
+
+    // 2. Fetch room-specific prompt (if any; the prompts API writes through
+    // on save, so edits show up here immediately)
+    let roomPromptContent: string | null;
+    const cachedRoom = getCachedPrompt(`room:${roomId}`);
+    if (cachedRoom.hit) {
+      roomPromptContent = cachedRoom.value;
+    } else {
+      const { data: roomPrompt } = await supabase
+        .from('report_prompts')
+        .select('prompt_content')
+        .eq('prompt_type', 'room')
+        .eq('room_id', roomId)
+        .eq('is_active', true)
+        .single();
+      roomPromptContent = roomPrompt?.prompt_content || null;
+      setCachedPrompt(`room:${roomId}`, roomPromptContent);
+    }
 
     // 3. Fetch messages for the room within the time range
     const { data: messages, error: messagesError } = await supabase
@@ -197,8 +218,8 @@ export async function GET(request: NextRequest) {
     // 4. Build the prompt
     const promptParts: string[] = [];
 
-    if (systemPrompt?.prompt_content) {
-      promptParts.push(systemPrompt.prompt_content);
+    if (systemPromptContent) {
+      promptParts.push(systemPromptContent);
     } else {
       // Fallback system prompt if none in database
       promptParts.push(
@@ -206,8 +227,8 @@ export async function GET(request: NextRequest) {
       );
     }
 
-    if (roomPrompt?.prompt_content) {
-      promptParts.push(`\nAdditional context for this room:\n${roomPrompt.prompt_content}`);
+    if (roomPromptContent) {
+      promptParts.push(`\nAdditional context for this room:\n${roomPromptContent}`);
     }
 
     // Add language instruction
@@ -222,18 +243,16 @@ export async function GET(request: NextRequest) {
     const fullPrompt = promptParts.join('\n');
 
     // 5. Call Gemini API
-    const apiKey = process.env.GOOGLE_AI_API_KEY;
-    if (!apiKey) {
+    if (!genAI) {
       return NextResponse.json({ error: 'AI service not configured' }, { status: 500 });
     }
 
-    const genAI = new GoogleGenerativeAI(apiKey);
-    const model = genAI.getGenerativeModel({ model: 'gemini-flash-latest' });
+    const model = genAI.getGenerativeModel({ model: GEMINI_MODEL });
 
-    const startTime = Date.now();
+    const startTime = performance.now();
     logLLMCall({
       provider: 'gemini',
-      model: 'gemini-flash-latest',
+      model: GEMINI_MODEL,
       endpoint: 'generateContent',
       roomId,
       promptLength: fullPrompt.length,
@@ -243,11 +262,11 @@ export async function GET(request: NextRequest) {
     const result = await model.generateContent(fullPrompt);
     const response = result.response;
     const report = response.text();
-    const durationMs = Date.now() - startTime;
+    const durationMs = Math.round(performance.now() - startTime);
 
     logLLMCall({
       provider: 'gemini',
-      model: 'gemini-flash-latest',
+      model: GEMINI_MODEL,
       endpoint: 'generateContent',
       roomId,
       promptLength: fullPrompt.length,
@@ -269,7 +288,7 @@ export async function GET(request: NextRequest) {
 
     logLLMCall({
       provider: 'gemini',
-      model: 'gemini-flash-latest',
+      model: GEMINI_MODEL,
       endpoint: 'generateContent',
       promptLength: 0,
       status: 'error',
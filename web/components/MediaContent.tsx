@@ -47,6 +47,8 @@ function getMediaUrl(mxcUrl?: string): string {
   return `/api/media?mxc=${encodeURIComponent(mxcUrl)}`;
 }
 
+const ANALYZABLE_MSGTYPES = new Set(["m.image", "m.video", "m.audio"]);
+
 function AnalysisPanel({ eventId, mediaType }: { eventId: string; mediaType: string }) {
   const [isOpen, setIsOpen] = useState(false);
   const [analysis, setAnalysis] = useState<MediaAnalysis | null>(null);
@@ -154,7 +156,7 @@ export default function MediaContent({ content, eventId }: { content: MediaInfo;
   const mimetype = content.info?.mimetype || "";
   const fileSize = formatFileSize(content.info?.size);
 
-  const showAnalysis = eventId && ['m.image', 'm.video', 'm.audio'].includes(msgtype || '');
+  const showAnalysis = eventId && ANALYZABLE_MSGTYPES.has(msgtype || "");
 
   if (!content.url) {
     return <span className="media-placeholder">[Media unavailable]</span>;
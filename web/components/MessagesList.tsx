@@ -45,9 +45,11 @@ const displaySender = (msg: Message) => {
   return sender;
 };
 
+const MEDIA_MSGTYPES = new Set(["m.image", "m.video", "m.audio", "m.file"]);
+
 const isMediaMessage = (content: MessageContent | null): boolean => {
   if (!content?.msgtype) return false;
-  return ["m.image", "m.video", "m.audio", "m.file"].includes(content.msgtype);
+  return MEDIA_MSGTYPES.has(content.msgtype);
 };
 
 function MessageBody({ content, eventId }: { content: MessageContent | null; eventId: string }) {
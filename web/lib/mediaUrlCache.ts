@@ -0,0 +1,34 @@
+// In-memory cache of mxc URL -> Supabase public URL, shared across requests in
+// a server process. Media rows are written once by the archiver and their
+// public URLs never change, so the TTL exists only to bound staleness if a
+// row is ever repointed. Only found URLs are cached: a miss may just mean the
+// archiver hasn't caught up yet, and should be retried on the next request.
+
+const TTL_MS = 5 * 60_000;
+const MAX_ENTRIES = 1024;
+
+type CacheEntry = {
+  url: string;
+  fetchedAt: number;
+};
+
+const cache = new Map<string, CacheEntry>();
+
+export function getCachedMediaUrl(mxcUrl: string): string | null {
+  const entry = cache.get(mxcUrl);
+  if (entry && Date.now() - entry.fetchedAt < TTL_MS) {
+    return entry.url;
+  }
+  return null;
+}
+
+export function setCachedMediaUrl(mxcUrl: string, url: string): void {
+  if (cache.size >= MAX_ENTRIES && !cache.has(mxcUrl)) {
+    // Maps iterate in insertion order; drop the oldest entry
+    const oldest = cache.keys().next().value;
+    if (oldest !== undefined) {
+      cache.delete(oldest);
+    }
+  }
+  cache.set(mxcUrl, { url, fetchedAt: Date.now() });
+}
@@ -0,0 +1,34 @@
+/**
+ * Small in-process TTL cache for report prompts.
+ *
+ * Prompts are read on every report generation but edited rarely, so the report
+ * route serves them from memory and the prompts API writes through on save,
+ * which also means an edit takes effect immediately rather than after the TTL.
+ */
+
+type CacheEntry = { value: string | null; fetchedAt: number };
+
+const TTL_MS = 60_000;
+// Keys include caller-supplied room ids (misses are cached too), so the map
+// must be bounded or arbitrary room_id parameters grow it forever
+const MAX_ENTRIES = 1024;
+const cache = new Map<string, CacheEntry>();
+
+export function getCachedPrompt(key: string): { hit: boolean; value: string | null } {
+  const entry = cache.get(key);
+  if (entry && Date.now() - entry.fetchedAt < TTL_MS) {
+    return { hit: true, value: entry.value };
+  }
+  return { hit: false, value: null };
+}
+
+export function setCachedPrompt(key: string, value: string | null): void {
+  if (cache.size >= MAX_ENTRIES && !cache.has(key)) {
+    // Maps iterate in insertion order; drop the oldest entry
+    const oldest = cache.keys().next().value;
+    if (oldest !== undefined) {
+      cache.delete(oldest);
+    }
+  }
+  cache.set(key, { value, fetchedAt: Date.now() });
+}